@@ -10,11 +10,25 @@ Features:
 """
 
 import psycopg2
+import psycopg2.extensions
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
-from neo4j import GraphDatabase
-from datetime import datetime
+from psycopg2.pool import ThreadedConnectionPool
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import Neo4jError
+from datetime import datetime, timezone
 import os
-from typing import List, Dict, Any, Optional, Set
+import sys
+import re
+import asyncio
+import gzip
+import mmap
+import tempfile
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import List, Dict, Any, Generator, Iterator, Optional, Set, Tuple
 import logging
 from dotenv import load_dotenv
 
@@ -32,6 +46,248 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Spooled buffers (COPY output, per-source Cypher) stay in memory up to this
+# size, then spill to a temp file
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
+# Merged UNWIND batches stop growing at about this much literal Cypher, which
+# keeps each parameter payload well within the server's message limits
+UNWIND_MAX_PAYLOAD_CHARS = 4 * 1024 * 1024
+# How often the loader logs how many statements have been executed
+PROGRESS_LOG_SECONDS = 1
+
+# Backslash escapes used by PostgreSQL's COPY text format
+_COPY_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v'}
+_COPY_ESCAPE_RE = re.compile(r'\\(.)')
+
+# Restore Python types (by udt_name) that sanitize_value_for_cypher renders specially,
+# using psycopg2's own typecasters so values match what a regular cursor returns
+# (e.g. PostgreSQL's '+00' offsets and 'infinity' timestamps); every other type
+# keeps its PostgreSQL text representation
+_COPY_CONVERTERS = {
+    'int2': psycopg2.extensions.INTEGER,
+    'int4': psycopg2.extensions.INTEGER,
+    'int8': psycopg2.extensions.LONGINTEGER,
+    'float4': psycopg2.extensions.FLOAT,
+    'float8': psycopg2.extensions.FLOAT,
+    'bool': psycopg2.extensions.BOOLEAN,
+    'timestamp': psycopg2.extensions.PYDATETIME,
+    'timestamptz': psycopg2.extensions.PYDATETIMETZ,
+}
+
+
+def _parse_copy_line(line: str, converters: List, cursor) -> tuple:
+    """
+    Split one COPY text-format line into a tuple of Python values.
+    cursor is passed to the typecasters, which take their tzinfo from it.
+    """
+    values = []
+    for field, convert in zip(line.split('\t'), converters):
+        if field == '\\N':
+            values.append(None)
+            continue
+        if '\\' in field:
+            field = _COPY_ESCAPE_RE.sub(lambda m: _COPY_ESCAPES.get(m.group(1), m.group(1)), field)
+        if convert:
+            try:
+                field = convert(field, cursor)
+            except (ValueError, psycopg2.DataError) as e:
+                logger.warning(f"[WARN] Keeping text value {field!r}: {e}")
+        values.append(field)
+    return tuple(values)
+
+
+# Single-pass escaping of backslashes and single quotes for Cypher string literals
+_CYPHER_ESCAPE = str.maketrans({'\\': '\\\\', "'": "\\'"})
+
+
+def _cypher_string(value: str) -> str:
+    return "'" + value.translate(_CYPHER_ESCAPE) + "'"
+
+
+def _cypher_datetime(value: datetime) -> str:
+    return f"datetime('{value.isoformat()}')"
+
+
+def _cypher_fallback(value: Any) -> str:
+    """Render subclasses of the dispatched types, and anything else as a string"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, (int, float)):
+        return str(value)
+    elif isinstance(value, datetime):
+        return _cypher_datetime(value)
+    return _cypher_string(str(value))
+
+
+# Exact-type dispatch for Cypher literals; a dict lookup beats an isinstance ladder
+_CYPHER_LITERALS = {
+    type(None): lambda v: "null",
+    bool: lambda v: "true" if v else "false",
+    int: str,
+    float: str,
+    str: _cypher_string,
+    datetime: _cypher_datetime,
+}
+
+
+# Cypher variable names for relationship targets whose first letter would be
+# ambiguous; any other label uses its lowercased first letter
+_VAR_ALIASES = {
+    'PaymentMethod': 'pm',
+    'PlayEvent': 'pe',
+    'Tag': 'tag',
+}
+
+
+# Constraint and index statements can't share a transaction with data writes
+_SCHEMA_STATEMENT_RE = re.compile(r'\s*(CREATE|DROP)\s+(\w+\s+)?(CONSTRAINT|INDEX)\b', re.IGNORECASE)
+
+# Parameterized node batches that only create nodes are independent of each
+# other, so they can be executed concurrently
+_UNWIND_CREATE_RE = re.compile(r'UNWIND \$rows AS row CREATE \(\w+:\w+\) SET \w+ = row$')
+
+# Node batches written by generate_cypher_for_table: UNWIND [{...}, ...] AS row <action>;
+_UNWIND_LITERAL_RE = re.compile(r'UNWIND \[(.*)\] AS row (.*?);?\s*$', re.S)
+_UNWIND_ROWS_PREFIX = 'UNWIND $rows AS row '
+
+# Server-side batching of a node batch's action over $rows when APOC is installed
+_APOC_ITERATE_QUERY = (
+    "CALL apoc.periodic.iterate('UNWIND $rows AS row RETURN row', $action, "
+    "{batchSize: $batch_size, parallel: true, params: {rows: $rows}})"
+)
+
+# One token of a list of property maps, as rendered by sanitize_value_for_cypher
+_CYPHER_MAP_TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<open>\{) | (?P<close>\}) | (?P<comma>,)
+    | (?P<key>\w+)\s*:
+    | '(?P<str>(?:[^'\\]|\\.)*)'
+    | datetime\('(?P<datetime>[^']*)'\)
+    | (?P<bool>true|false) | (?P<null>null)
+    | (?P<number>-?[0-9][0-9.eE+-]*)
+)""", re.X | re.S)
+_CYPHER_UNESCAPE_RE = re.compile(r'\\(.)', re.S)
+_CYPHER_UNESCAPES = {'n': '\n', 'r': '\r', 't': '\t', 'b': '\b', 'f': '\f'}
+
+
+def _cypher_literal_value(kind: str, text: str) -> Any:
+    """Convert one scalar token from _CYPHER_MAP_TOKEN_RE back to a Python value"""
+    if kind == 'str':
+        if '\\' in text:
+            text = _CYPHER_UNESCAPE_RE.sub(lambda m: _CYPHER_UNESCAPES.get(m.group(1), m.group(1)), text)
+        return text
+    if kind == 'datetime':
+        value = datetime.fromisoformat(text)
+        # datetime() without an offset uses the server's default timezone (UTC)
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if kind == 'bool':
+        return text == 'true'
+    if kind == 'null':
+        return None
+    if '.' in text or 'e' in text or 'E' in text:
+        return float(text)
+    return int(text)
+
+
+def _canonicalize(statement: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Split a literal UNWIND node batch into a parameterized template and its rows,
+    so the template is planned once and reused for every batch of the same shape.
+    Property keys are interned, so every row of a batch shares one string per
+    column instead of carrying its own copies.
+    Returns None for statements that aren't in that form.
+    """
+    match = _UNWIND_LITERAL_RE.match(statement)
+    if not match:
+        return None
+    
+    text, action = match.groups()
+    rows = []
+    row = None
+    key = None
+    pos = 0
+    end = len(text)
+    token = _CYPHER_MAP_TOKEN_RE.match
+    intern = sys.intern
+    try:
+        while pos < end:
+            m = token(text, pos)
+            if m is None:
+                return None
+            pos = m.end()
+            kind = m.lastgroup
+            if kind == 'open':
+                row = {}
+            elif kind == 'close':
+                rows.append(row)
+                row = None
+            elif kind == 'key':
+                key = intern(m.group('key'))
+            elif kind != 'comma':
+                row[key] = _cypher_literal_value(kind, m.group(kind))
+    except (TypeError, ValueError):
+        return None
+    
+    # Interned so every batch of a table shares one template object and the
+    # merge check in _plan_statements is an identity hit
+    return intern(_UNWIND_ROWS_PREFIX + action), rows
+
+
+# Tokens of a Cypher script (as UTF-8 bytes) that matter for splitting it into
+# statements: comments, the ';' that ends a statement, and runs of everything
+# else. A run takes in whole string literals (so a ';' inside one is ignored)
+# and is matched in one go by the regex engine, so the Python loop in
+# _scan_statements only wakes up for comments and ';', not for every literal.
+# Comments and literals may be cut off by the end of the buffer (\Z) so a
+# partial one is still consumed.
+_CYPHER_TOKEN_RE = re.compile(rb"""
+    (?P<comment>//[^\n]*\n?)
+    | (?P<block>/\*.*?(?:\*/|\Z))
+    | (?P<end>;)
+    | (?:
+        [^'"/;]+
+        | '[^'\\]*(?:\\(?:.|\Z)[^'\\]*)*(?:'|\Z)
+        | "[^"\\]*(?:\\(?:.|\Z)[^"\\]*)*(?:"|\Z)
+        | /(?![/*])
+    )+
+""", re.S | re.X)
+
+
+def _scan_statements(buf: bytes, final: bool) -> Generator[str, None, bytes]:
+    """
+    Yield each complete statement in buf, decoded and without comments, and
+    return the unconsumed tail. Unless final, a token touching the end of buf
+    may continue in the next chunk, so its statement is left in the tail.
+    """
+    pieces = []
+    pos = 0  # end of the last piece copied into the current statement
+    start = 0  # start of the current statement
+    end = len(buf)
+    for m in _CYPHER_TOKEN_RE.finditer(buf):
+        kind = m.lastgroup
+        if kind == 'end':
+            pieces.append(buf[pos:m.end()])
+            statement = b''.join(pieces).strip()
+            pieces = []
+            pos = start = m.end()
+            if statement != b';':
+                yield statement.decode('utf-8')
+        elif not final and m.end() == end:
+            return buf[start:]
+        elif kind is not None:
+            # Drop the comment but keep the statement's tokens apart
+            pieces.append(buf[pos:m.start()])
+            pieces.append(b'\n' if kind == 'comment' else b' ')
+            pos = m.end()
+    
+    if not final:
+        return buf[start:]
+    pieces.append(buf[pos:])
+    statement = b''.join(pieces).strip()
+    if statement:
+        yield statement.decode('utf-8')
+    return b''
+
 
 class ETLConfig:
     """Configuration for ETL control database connection"""
@@ -80,15 +336,51 @@ class ETLConfig:
             password=password
         )
 
+
+class _ControlConnection(psycopg2.extensions.connection):
+    """
+    Control database connection that remembers which statements it has
+    PREPAREd, so the state lives and dies with the server session itself.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+@contextmanager
+def _pooled_connection(pool):
+    """Borrow a connection from a control database pool for one operation"""
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        # The pool rolls back any transaction left open before reuse
+        pool.putconn(conn)
+
+
 class PostgresToNeo4jETL:
     """Main ETL class that orchestrates data extraction and Cypher generation"""
     
-    def __init__(self, control_db_config: ETLConfig, output_file: str = "./complete_graph.cypher"):
+    def __init__(self, control_db_config: ETLConfig, output_file: str = "./complete_graph.cypher",
+                 max_source_workers: int = 8, node_batch_size: int = 1000,
+                 compress_output: bool = False):
         self.control_db_config = control_db_config
+        self.compress_output = compress_output
+        # Compressed output is gzip; the loader decompresses .gz scripts on read
+        if compress_output and not output_file.endswith('.gz'):
+            output_file += '.gz'
         self.output_file = output_file
-        self.control_conn = None
+        self.max_source_workers = max_source_workers
+        self.node_batch_size = node_batch_size  # Rows per UNWIND statement
+        self.control_pool = None  # Control DB connections, shared by the source threads
         self.current_log_id = None
-        self.cypher_output = []  # Stores all Cypher statements
+        self._raw_out = None  # Output file handle on disk
+        self._out = None  # Output stream (gzip-wrapped when compressing); per-source buffers are appended in order
+        self._line_count = 0
+        self._bytes_written = 0
+        self._pending_table_logs = {}  # source_id -> table log rows queued until the source finishes
+        self._schema_cache = {}  # source_id -> {table_name: {'columns': [...], 'types': {...}, 'pk': ...}}
         
         # Mappings loaded from database
         self.label_mappings = {}  # table_name -> node_label
@@ -97,7 +389,7 @@ class PostgresToNeo4jETL:
     def load_label_mappings(self):
         """Load node label mappings from control database"""
         try:
-            with self.control_conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT table_name, node_label 
                     FROM node_label_mappings 
@@ -117,7 +409,7 @@ class PostgresToNeo4jETL:
     def load_relationship_mappings(self):
         """Load relationship definitions from control database"""
         try:
-            with self.control_conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT source_db, relationship_type, from_label, to_label, 
                            join_condition, junction_table, junction_label, 
@@ -133,7 +425,7 @@ class PostgresToNeo4jETL:
                     source_db = mapping['source_db']
                     if source_db not in self.relationship_mappings:
                         self.relationship_mappings[source_db] = []
-                    self.relationship_mappings[source_db].append(dict(mapping))
+                    self.relationship_mappings[source_db].append(mapping)
                 
                 total_relationships = sum(len(rels) for rels in self.relationship_mappings.values())
                 logger.info(f"[OK] Loaded {total_relationships} relationship definitions")
@@ -144,19 +436,35 @@ class PostgresToNeo4jETL:
     def get_node_label(self, table_name: str) -> str:
         """
         Get Neo4j node label for a table.
-        Falls back to capitalized table name if not in mappings.
+        Falls back to capitalized table name if not in mappings; the fallback
+        is stored so later lookups are a plain dict hit.
         """
-        return self.label_mappings.get(table_name, table_name.capitalize())
+        label = self.label_mappings.get(table_name)
+        if label is None:
+            label = self.label_mappings.setdefault(table_name, table_name.capitalize())
+        return label
     
     def connect_to_control_db(self):
-        """Establish connection to the ETL control database"""
+        """Create the connection pool for the ETL control database"""
         try:
-            self.control_conn = psycopg2.connect(
+            # One connection per source worker, plus one for the main thread.
+            # putconn closes any connection beyond minconn, so keep them all
+            # open; otherwise most borrows would reconnect.
+            pool_size = self.max_source_workers + 1
+            self.control_pool = ThreadedConnectionPool(
+                minconn=pool_size,
+                maxconn=pool_size,
                 host=self.control_db_config.host,
                 port=self.control_db_config.port,
                 dbname=self.control_db_config.dbname,
                 user=self.control_db_config.user,
-                password=self.control_db_config.password
+                password=self.control_db_config.password,
+                application_name='etl_pg_to_neo4j',
+                connection_factory=_ControlConnection,
+                # The control DB only holds run/table logs and script records, so
+                # commits don't wait for the WAL flush. A crash can lose the last
+                # few hundred ms of log rows, but never leaves them inconsistent.
+                options='-c synchronous_commit=off'
             )
             logger.info(f"[OK] Connected to control database: {self.control_db_config.dbname}")
             
@@ -172,20 +480,19 @@ class PostgresToNeo4jETL:
     def start_etl_run(self) -> Optional[int]:
         """Create a new ETL run log entry"""
         try:
-            with self.control_conn.cursor() as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO etl_run_logs (run_start_time, status)
                     VALUES (NOW(), 'running')
                     RETURNING log_id
                 """)
                 log_id = cur.fetchone()[0]
-                self.control_conn.commit()
+                conn.commit()
                 self.current_log_id = log_id
                 logger.info(f"[OK] Started ETL run with log_id: {log_id}")
                 return log_id
         except Exception as e:
             logger.error(f"[ERROR] Failed to start ETL run: {e}")
-            self.control_conn.rollback()
             return None
     
     def complete_etl_run(self, status: str = 'completed'):
@@ -194,22 +501,21 @@ class PostgresToNeo4jETL:
             return
         
         try:
-            with self.control_conn.cursor() as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor() as cur:
                 cur.execute("""
                     UPDATE etl_run_logs
                     SET run_end_time = NOW(), status = %s
                     WHERE log_id = %s
                 """, (status, self.current_log_id))
-                self.control_conn.commit()
+                conn.commit()
                 logger.info(f"[OK] Completed ETL run with status: {status}")
         except Exception as e:
             logger.error(f"[ERROR] Failed to complete ETL run: {e}")
-            self.control_conn.rollback()
     
     def get_active_sources(self) -> List[Dict[str, Any]]:
         """Retrieve all active source databases from configuration"""
         try:
-            with self.control_conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT source_id, source_name, db_host, db_port, db_name, 
                            db_user, db_password
@@ -219,7 +525,7 @@ class PostgresToNeo4jETL:
                 """)
                 sources = cur.fetchall()
                 logger.info(f"[OK] Found {len(sources)} active source database(s)")
-                return [dict(row) for row in sources]
+                return sources
         except Exception as e:
             logger.error(f"[ERROR] Failed to retrieve source databases: {e}")
             return []
@@ -230,7 +536,7 @@ class PostgresToNeo4jETL:
         Returns a dictionary mapping table names to sets of excluded column names.
         """
         try:
-            with self.control_conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT table_name, column_name
                     FROM field_exclusion_rules
@@ -255,39 +561,78 @@ class PostgresToNeo4jETL:
             logger.error(f"[ERROR] Failed to get exclusion rules: {e}")
             return {}
     
-    def create_table_log(self, source_id: int, table_name: str) -> Optional[int]:
-        """Create a log entry for processing a specific table"""
-        try:
-            with self.control_conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO etl_table_logs 
-                    (log_id, source_id, table_name, status, is_progressing, start_time)
-                    VALUES (%s, %s, %s, 'running', true, NOW())
-                    RETURNING table_log_id
-                """, (self.current_log_id, source_id, table_name))
-                table_log_id = cur.fetchone()[0]
-                self.control_conn.commit()
-                return table_log_id
-        except Exception as e:
-            logger.error(f"[ERROR] Failed to create table log: {e}")
-            self.control_conn.rollback()
-            return None
+    def create_table_log(self, source_id: int, table_name: str) -> Dict[str, Any]:
+        """
+        Queue a log entry for processing a specific table.
+        Returns the entry for update_table_log; rows are written by flush_table_logs.
+        """
+        table_log = {
+            'source_id': source_id,
+            'table_name': table_name,
+            'status': 'running',
+            'start_time': datetime.now().astimezone(),
+            'end_time': None,
+            'rows_processed': 0,
+            'error_message': None,
+        }
+        self._pending_table_logs.setdefault(source_id, []).append(table_log)
+        return table_log
     
-    def update_table_log(self, table_log_id: int, status: str, 
+    def update_table_log(self, table_log: Dict[str, Any], status: str, 
                         rows_processed: int = 0, error_message: str = None):
-        """Update the table log with completion status"""
+        """Record completion status on a queued table log entry"""
+        table_log.update(
+            status=status,
+            end_time=datetime.now().astimezone(),
+            rows_processed=rows_processed,
+            error_message=error_message,
+        )
+    
+    def _prepare_table_log_insert(self, conn, cur):
+        """
+        Prepare the table log INSERT once per pooled connection. Entries are
+        passed as parallel arrays, so the statement text (and its cached plan)
+        is the same no matter how many tables a source has.
+        """
+        if 'ins_table_logs' in conn.prepared_statements:
+            return
+        cur.execute("""
+            PREPARE ins_table_logs (int4, int4, text[], text[], timestamptz[],
+                                    timestamptz[], int4[], text[]) AS
+            INSERT INTO etl_table_logs
+            (log_id, source_id, table_name, status, is_progressing, is_done,
+             start_time, end_time, rows_processed, error_message)
+            SELECT $1, $2, t.table_name, t.status, t.status = 'running', t.status <> 'running',
+                   t.start_time, t.end_time, t.rows_processed, t.error_message
+            FROM unnest($3, $4, $5, $6, $7, $8)
+                AS t(table_name, status, start_time, end_time, rows_processed, error_message)
+        """)
+        conn.prepared_statements.add('ins_table_logs')
+    
+    def flush_table_logs(self, source_id: int):
+        """Write a source's queued table log entries with one prepared INSERT and commit"""
+        pending = self._pending_table_logs.pop(source_id, [])
+        if not pending:
+            return
+        
         try:
-            with self.control_conn.cursor() as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor() as cur:
+                self._prepare_table_log_insert(conn, cur)
                 cur.execute("""
-                    UPDATE etl_table_logs
-                    SET status = %s, is_progressing = false, is_done = true,
-                        end_time = NOW(), rows_processed = %s, error_message = %s
-                    WHERE table_log_id = %s
-                """, (status, rows_processed, error_message, table_log_id))
-                self.control_conn.commit()
+                    EXECUTE ins_table_logs (%s, %s, %s::text[], %s::text[], %s::timestamptz[],
+                                            %s::timestamptz[], %s::int4[], %s::text[])
+                """, (
+                    self.current_log_id, source_id,
+                    [log['table_name'] for log in pending],
+                    [log['status'] for log in pending],
+                    [log['start_time'] for log in pending],
+                    [log['end_time'] for log in pending],
+                    [log['rows_processed'] for log in pending],
+                    [log['error_message'] for log in pending],
+                ))
+                conn.commit()
         except Exception as e:
-            logger.error(f"[ERROR] Failed to update table log: {e}")
-            self.control_conn.rollback()
+            logger.error(f"[ERROR] Failed to write table logs: {e}")
     
     def connect_to_source(self, source_config: Dict[str, Any]):
         """Connect to a source database"""
@@ -302,13 +647,13 @@ class PostgresToNeo4jETL:
             logger.info(f"[OK] Connected to source: {source_config['source_name']}")
             
             # Update last_accessed timestamp in control database
-            with self.control_conn.cursor() as cur:
+            with _pooled_connection(self.control_pool) as control_conn, control_conn.cursor() as cur:
                 cur.execute("""
                     UPDATE source_databases
                     SET last_accessed = NOW()
                     WHERE source_id = %s
                 """, (source_config['source_id'],))
-                self.control_conn.commit()
+                control_conn.commit()
             
             return conn
         except Exception as e:
@@ -326,139 +671,190 @@ class PostgresToNeo4jETL:
                     AND table_type = 'BASE TABLE'
                     ORDER BY table_name
                 """)
-                tables = [row[0] for row in cur.fetchall()]
+                tables = [row[0] for row in cur]
                 logger.info(f"[OK] Found {len(tables)} tables in source database")
                 return tables
         except Exception as e:
             logger.error(f"[ERROR] Failed to get table names: {e}")
             return []
     
-    def get_table_columns(self, source_conn, table_name: str, 
-                         excluded_columns: Set[str]) -> List[str]:
+    def load_schema_metadata(self, source_id: int, source_conn):
         """
-        Get column names for a table, excluding specified columns.
-        Returns list of column names in ordinal position order.
+        Prefetch column and primary key metadata for every table in a source
+        with a single query, so per-table lookups don't need a round-trip.
         """
+        schema = {}
         try:
             with source_conn.cursor() as cur:
                 cur.execute("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_schema = 'public' 
-                    AND table_name = %s
-                    ORDER BY ordinal_position
-                """, (table_name,))
-                all_columns = [row[0] for row in cur.fetchall()]
-                
-                # Filter out excluded columns
-                included_columns = [col for col in all_columns if col not in excluded_columns]
-                
-                if excluded_columns:
-                    excluded_list = [col for col in all_columns if col in excluded_columns]
-                    logger.info(f"  Excluded columns: {excluded_list}")
-                
-                return included_columns
+                    SELECT c.table_name, c.column_name, c.udt_name, (a.attname IS NOT NULL) AS is_pk
+                    FROM information_schema.columns c
+                    LEFT JOIN pg_index i
+                        ON i.indrelid = (quote_ident(c.table_schema) || '.' || quote_ident(c.table_name))::regclass
+                        AND i.indisprimary
+                    LEFT JOIN pg_attribute a
+                        ON a.attrelid = i.indrelid
+                        AND a.attnum = ANY(i.indkey)
+                        AND a.attname = c.column_name
+                    WHERE c.table_schema = 'public'
+                    ORDER BY c.table_name, c.ordinal_position
+                """)
+                for table_name, column_name, udt_name, is_pk in cur:
+                    table = schema.setdefault(table_name, {'columns': [], 'types': {}, 'pk': None})
+                    table['columns'].append(column_name)
+                    table['types'][column_name] = udt_name
+                    if is_pk and table['pk'] is None:
+                        table['pk'] = column_name
         except Exception as e:
-            logger.error(f"[ERROR] Failed to get columns for table {table_name}: {e}")
+            logger.error(f"[ERROR] Failed to load schema metadata for source_id {source_id}: {e}")
+            source_conn.rollback()
+        
+        self._schema_cache[source_id] = schema
+    
+    def get_table_columns(self, source_id: int, source_name: str, table_name: str, 
+                         excluded_columns: Set[str]) -> List[str]:
+        """
+        Get column names for a table, excluding specified columns.
+        Returns list of column names in ordinal position order.
+        """
+        table = self._schema_cache.get(source_id, {}).get(table_name)
+        if not table:
+            logger.error(f"[ERROR] No column metadata for table {source_name}.{table_name}")
             return []
+        
+        # Split columns into included and excluded in a single pass
+        included_columns, excluded_list = [], []
+        for col in table['columns']:
+            (excluded_list if col in excluded_columns else included_columns).append(col)
+        
+        if excluded_columns:
+            logger.info(f"  Excluded columns ({source_name}.{table_name}): {excluded_list}")
+        
+        return included_columns
     
-    def get_primary_key(self, source_conn, table_name: str) -> Optional[str]:
+    def get_primary_key(self, source_id: int, table_name: str) -> Optional[str]:
         """Get the primary key column name for a table"""
-        try:
-            with source_conn.cursor() as cur:
-                cur.execute("""
-                    SELECT a.attname
-                    FROM pg_index i
-                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
-                    WHERE i.indrelid = %s::regclass AND i.indisprimary
-                """, (table_name,))
-                result = cur.fetchone()
-                return result[0] if result else None
-        except Exception as e:
-            logger.error(f"[ERROR] Failed to get primary key for {table_name}: {e}")
-            return None
+        table = self._schema_cache.get(source_id, {}).get(table_name)
+        return table['pk'] if table else None
     
-    def extract_table_data(self, source_conn, table_name: str, columns: List[str]) -> List[Dict]:
-        """Extract all rows from a table with specified columns"""
+    def get_column_types(self, source_id: int, table_name: str) -> Dict[str, str]:
+        """Get a column name -> PostgreSQL type name (udt_name) mapping for a table"""
+        table = self._schema_cache.get(source_id, {}).get(table_name)
+        return table['types'] if table else {}
+    
+    def extract_table_data(self, source_conn, table_name: str, columns: List[str],
+                           column_types: Dict[str, str]) -> Tuple[int, Iterator[tuple]]:
+        """
+        Extract all rows from a table with specified columns.
+        Uses COPY ... TO STDOUT, which skips the per-row protocol and dict
+        construction of a regular SELECT. The copy runs immediately into a
+        spooled buffer; returns the row count reported by COPY and an
+        iterator that parses the buffer lazily into tuples in column order.
+        """
+        # Quote identifiers so reserved or mixed-case names are copied safely
+        query = sql.SQL("COPY (SELECT {columns} FROM {table}) TO STDOUT").format(
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+            table=sql.Identifier(table_name),
+        )
+        converters = [_COPY_CONVERTERS.get(column_types.get(col)) for col in columns]
+        encoding = psycopg2.extensions.encodings.get(source_conn.encoding, 'utf-8')
+        
+        buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
         try:
-            column_list = ", ".join(columns)
-            query = f"SELECT {column_list} FROM {table_name}"
-            
-            with source_conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query)
-                rows = cur.fetchall()
-                logger.info(f"  Extracted {len(rows)} rows from {table_name}")
-                return [dict(row) for row in rows]
+            with source_conn.cursor() as cur:
+                cur.copy_expert(query, buf)
+                # COPY's command tag carries the row count; no separate count(*) needed
+                row_count = cur.rowcount
         except Exception as e:
+            buf.close()
             logger.error(f"[ERROR] Failed to extract data from {table_name}: {e}")
-            return []
+            raise
+        
+        if row_count == 0:
+            buf.close()
+            return 0, iter(())
+        # The cursor is closed by now, but the typecasters only read its tzinfo_factory
+        return row_count, self._iter_copied_rows(buf, encoding, converters, cur)
+    
+    def _iter_copied_rows(self, buf, encoding: str, converters: List, cursor) -> Iterator[tuple]:
+        """Parse a spooled COPY buffer into row tuples, closing it when exhausted"""
+        with buf:
+            buf.seek(0)
+            # One row per line; embedded newlines are escaped by COPY
+            for line in buf:
+                yield _parse_copy_line(line.decode(encoding)[:-1], converters, cursor)
     
     def sanitize_value_for_cypher(self, value: Any) -> str:
         """
         Convert Python values to Cypher-compatible string representation.
         Handles NULL, boolean, numeric, string, and datetime types.
         """
-        if value is None:
-            return "null"
-        elif isinstance(value, bool):
-            return "true" if value else "false"
-        elif isinstance(value, (int, float)):
-            return str(value)
-        elif isinstance(value, str):
-            # Escape backslashes and single quotes for Cypher
-            escaped = value.replace("\\", "\\\\").replace("'", "\\'")
-            return f"'{escaped}'"
-        elif isinstance(value, datetime):
-            return f"datetime('{value.isoformat()}')"
-        else:
-            # Convert other types to string and escape
-            escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
-            return f"'{escaped}'"
+        return _CYPHER_LITERALS.get(type(value), _cypher_fallback)(value)
     
-    def generate_cypher_for_table(self, source_name: str, table_name: str, 
-                                  rows: List[Dict], columns: List[str],
+    def generate_cypher_for_table(self, out, source_name: str, table_name: str, 
+                                  rows: Iterator[tuple], row_count: int, columns: List[str],
                                   primary_key: Optional[str]):
         """
-        Generate Cypher CREATE statements for nodes.
+        Generate batched Cypher UNWIND ... CREATE statements for nodes.
         Adds constraint on primary key if available.
+        Empty tables without a primary key constraint produce no output.
         """
+        needs_constraint = bool(primary_key and primary_key in columns)
+        if row_count == 0 and not needs_constraint:
+            return
+        
         node_label = self.get_node_label(table_name)
         
         # Add header comment
-        self.cypher_output.append(f"// ============================================")
-        self.cypher_output.append(f"// Source: {source_name}")
-        self.cypher_output.append(f"// Table: {table_name}")
-        self.cypher_output.append(f"// Node Label: {node_label}")
-        self.cypher_output.append(f"// Rows: {len(rows)}")
-        self.cypher_output.append(f"// Generated: {datetime.now().isoformat()}")
-        self.cypher_output.append(f"// ============================================\n")
+        self._write_line(out, f"// ============================================")
+        self._write_line(out, f"// Source: {source_name}")
+        self._write_line(out, f"// Table: {table_name}")
+        self._write_line(out, f"// Node Label: {node_label}")
+        self._write_line(out, f"// Rows: {row_count}")
+        self._write_line(out, f"// Generated: {datetime.now().isoformat()}")
+        self._write_line(out, f"// ============================================\n")
         
         # Create constraint on primary key
-        if primary_key and primary_key in columns:
+        if needs_constraint:
             constraint_name = f"constraint_{table_name}_{primary_key}"
-            self.cypher_output.append(
+            self._write_line(out, 
                 f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS "
                 f"FOR (n:{node_label}) "
                 f"REQUIRE n.{primary_key} IS UNIQUE;\n"
             )
         
-        # Generate CREATE statement for each row
+        # Create nodes in batches: one UNWIND statement per node_batch_size rows,
+        # each row a property map (null values are omitted).
+        # Everything that is constant for the table is built once, outside the loop.
+        sanitize = self.sanitize_value_for_cypher
+        write = out.write
+        column_order = tuple(columns)
+        batch_size = self.node_batch_size
+        line_prefix = "UNWIND [{"
+        line_suffix = f"}}] AS row CREATE (n:{node_label}) SET n = row;\n"
+        batch = []
         for row in rows:
-            properties = []
-            for col in columns:
-                if col in row and row[col] is not None:
-                    value = self.sanitize_value_for_cypher(row[col])
-                    properties.append(f"{col}: {value}")
-            
-            if properties:
-                properties_str = ", ".join(properties)
-                self.cypher_output.append(
-                    f"CREATE (:{node_label} {{{properties_str}}});"
-                )
+            properties_str = ", ".join(
+                f"{col}: {sanitize(value)}"
+                for col, value in zip(column_order, row) if value is not None
+            )
+            
+            if properties_str:
+                batch.append(properties_str)
+                if len(batch) == batch_size:
+                    write(line_prefix)
+                    write("}, {".join(batch))
+                    write(line_suffix)
+                    batch = []
+        
+        if batch:
+            write(line_prefix)
+            write("}, {".join(batch))
+            write(line_suffix)
         
-        self.cypher_output.append("")  # Empty line after table
+        self._write_line(out, "")  # Empty line after table
     
-    def generate_relationships(self, source_name: str):
+    def generate_relationships(self, out, source_name: str):
         """
         Generate Cypher MATCH/CREATE statements for relationships.
         Uses relationships defined in relationship_mappings table.
@@ -468,49 +864,42 @@ class PostgresToNeo4jETL:
             logger.info(f"  No relationships defined for {source_name}")
             return
         
-        self.cypher_output.append("// ============================================")
-        self.cypher_output.append(f"// Relationships for: {source_name}")
-        self.cypher_output.append(f"// Generated: {datetime.now().isoformat()}")
-        self.cypher_output.append("// ============================================\n")
+        self._write_line(out, "// ============================================")
+        self._write_line(out, f"// Relationships for: {source_name}")
+        self._write_line(out, f"// Generated: {datetime.now().isoformat()}")
+        self._write_line(out, "// ============================================\n")
         
         # Generate Cypher for each relationship
         for rel in self.relationship_mappings[source_name]:
             # Add description comment
             if rel['description']:
-                self.cypher_output.append(f"// {rel['description']}")
+                self._write_line(out, f"// {rel['description']}")
             
             # Debug: log the relationship details
             logger.info(f"  Relationship: {rel['relationship_type']} | Junction: {rel.get('junction_table')}")
             
+            # Variable names must match the aliases used in join_condition
             from_var = rel['from_label'].lower()[0]
-            to_var = rel['to_label'].lower()[0]
-            
-            # Handle special variable naming
-            if rel['to_label'] == 'PaymentMethod':
-                to_var = 'pm'
-            elif rel['to_label'] == 'PlayEvent':
-                to_var = 'pe'
-            elif rel['to_label'] == 'Tag':
-                to_var = 'tag'
+            to_var = _VAR_ALIASES.get(rel['to_label'], rel['to_label'].lower()[0])
             
             # Check if this uses a junction table (many-to-many relationship)
             if rel.get('junction_table') and rel.get('junction_label'):
                 # Junction table relationship
-                self.cypher_output.append(
+                self._write_line(out, 
                     f"MATCH ({from_var}:{rel['from_label']}), "
                     f"(link:{rel['junction_label']}), "
                     f"({to_var}:{rel['to_label']})"
                 )
             else:
                 # Direct relationship
-                self.cypher_output.append(
+                self._write_line(out, 
                     f"MATCH ({from_var}:{rel['from_label']}), ({to_var}:{rel['to_label']})"
                 )
             
-            self.cypher_output.append(f"WHERE {rel['join_condition']}")
-            self.cypher_output.append(f"CREATE ({from_var})-[:{rel['relationship_type']}]->({to_var});\n")
+            self._write_line(out, f"WHERE {rel['join_condition']}")
+            self._write_line(out, f"CREATE ({from_var})-[:{rel['relationship_type']}]->({to_var});\n")
     
-    def process_source_database(self, source_config: Dict[str, Any]):
+    def process_source_database(self, source_config: Dict[str, Any], out):
         """
         Process a single source database:
         1. Connect to source
@@ -534,79 +923,165 @@ class PostgresToNeo4jETL:
             # Load configuration for this source
             exclusion_rules = self.get_exclusion_rules(source_id)
             tables = self.get_table_names(source_conn)
+            self.load_schema_metadata(source_id, source_conn)
             
             # Add database header to output
-            self.cypher_output.append(f"\n// ========================================")
-            self.cypher_output.append(f"// DATABASE: {source_name}")
-            self.cypher_output.append(f"// Total tables: {len(tables)}")
-            self.cypher_output.append(f"// ========================================\n")
+            self._write_line(out, f"\n// ========================================")
+            self._write_line(out, f"// DATABASE: {source_name}")
+            self._write_line(out, f"// Total tables: {len(tables)}")
+            self._write_line(out, f"// ========================================\n")
+            
+            # Tables are extracted on a producer thread while this thread formats
+            # the previous table's rows, so COPY I/O overlaps Cypher generation
+            extracted = queue.Queue(maxsize=2)
+            producer = threading.Thread(
+                target=self._extract_tables,
+                args=(source_id, source_name, source_conn, tables, exclusion_rules, extracted),
+                daemon=True,
+            )
+            producer.start()
+            
+            # Process each extracted table
+            while True:
+                item = extracted.get()
+                if item is None:
+                    break
+                table_name, table_log, columns, primary_key, row_count, rows = item
+                
+                try:
+                    # Generate Cypher as the copied rows are parsed
+                    self.generate_cypher_for_table(
+                        out, source_name, table_name, rows, row_count, columns, primary_key
+                    )
+                    
+                    # Update log as completed
+                    self.update_table_log(table_log, 'completed', row_count)
+                    logger.info(f"  [OK] Completed: {source_name}.{table_name} ({row_count} rows)")
+                    
+                except Exception as e:
+                    error_msg = f"Error processing table {table_name}: {str(e)}"
+                    logger.error(f"  [ERROR] {source_name}: {error_msg}")
+                    self.update_table_log(table_log, 'failed', 0, error_msg)
             
-            # Process each table
+            producer.join()
+            
+            # Generate relationships for this source
+            logger.info(f"\n-> Generating relationships for {source_name}")
+            self.generate_relationships(out, source_name)
+            
+        finally:
+            self.flush_table_logs(source_id)
+            source_conn.close()
+            logger.info(f"[OK] Disconnected from source: {source_name}")
+    
+    def _extract_tables(self, source_id: int, source_name: str, source_conn, tables: List[str],
+                        exclusion_rules: Dict[str, Set[str]], extracted: queue.Queue):
+        """
+        Producer for process_source_database: COPY each table and queue
+        (table_name, table_log, columns, primary_key, row_count, rows) for Cypher
+        generation. Always ends the queue with None.
+        """
+        try:
             for table_name in tables:
-                logger.info(f"\n-> Processing table: {table_name}")
-                table_log_id = self.create_table_log(source_id, table_name)
+                logger.info(f"\n-> Processing table: {source_name}.{table_name}")
+                table_log = self.create_table_log(source_id, table_name)
                 
                 try:
                     # Get columns (respecting exclusions)
                     excluded_cols = exclusion_rules.get(table_name, set())
-                    columns = self.get_table_columns(source_conn, table_name, excluded_cols)
+                    columns = self.get_table_columns(source_id, source_name, table_name, excluded_cols)
                     
                     if not columns:
-                        logger.warning(f"  [WARN] No columns available for {table_name}, skipping")
-                        self.update_table_log(table_log_id, 'failed', 0, 
+                        logger.warning(f"  [WARN] No columns available for {source_name}.{table_name}, skipping")
+                        self.update_table_log(table_log, 'failed', 0, 
                                             'No columns available after exclusions')
                         continue
                     
                     # Get primary key for constraint creation
-                    primary_key = self.get_primary_key(source_conn, table_name)
+                    primary_key = self.get_primary_key(source_id, table_name)
                     if primary_key:
-                        logger.info(f"  Primary key: {primary_key}")
+                        logger.info(f"  Primary key ({source_name}.{table_name}): {primary_key}")
                     
                     # Extract data
-                    rows = self.extract_table_data(source_conn, table_name, columns)
-                    
-                    # Generate Cypher
-                    self.generate_cypher_for_table(source_name, table_name, rows, columns, primary_key)
-                    
-                    # Update log as completed
-                    self.update_table_log(table_log_id, 'completed', len(rows))
-                    logger.info(f"  [OK] Completed: {table_name} ({len(rows)} rows)")
+                    column_types = self.get_column_types(source_id, table_name)
+                    row_count, rows = self.extract_table_data(source_conn, table_name, columns, column_types)
                     
                 except Exception as e:
                     error_msg = f"Error processing table {table_name}: {str(e)}"
-                    logger.error(f"  [ERROR] {error_msg}")
-                    self.update_table_log(table_log_id, 'failed', 0, error_msg)
-            
-            # Generate relationships for this source
-            logger.info(f"\n-> Generating relationships for {source_name}")
-            self.generate_relationships(source_name)
-            
+                    logger.error(f"  [ERROR] {source_name}: {error_msg}")
+                    # Reset the aborted transaction so the next table can be read
+                    source_conn.rollback()
+                    self.update_table_log(table_log, 'failed', 0, error_msg)
+                    continue
+                
+                extracted.put((table_name, table_log, columns, primary_key, row_count, rows))
         finally:
-            source_conn.close()
-            logger.info(f"[OK] Disconnected from source: {source_name}")
+            extracted.put(None)
     
-    def write_output_file(self):
-        """Write all accumulated Cypher statements to a single file"""
+    def _write_line(self, out, line: str = ""):
+        """Write one line of Cypher to a source's output buffer"""
+        out.write(line)
+        out.write("\n")
+    
+    def _process_and_capture(self, source_config: Dict[str, Any]):
+        """
+        Process a source database into its own spooled buffer.
+        Runs on a worker thread; the buffer is appended to the output file later.
+        """
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode='w+', encoding='utf-8')
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                # Write file header
-                f.write("// ========================================\n")
-                f.write("// COMPLETE GRAPH DATABASE IMPORT\n")
-                f.write(f"// Generated: {datetime.now().isoformat()}\n")
-                f.write("// ========================================\n\n")
-                
-                # Write all Cypher statements
-                f.write("\n".join(self.cypher_output))
+            self.process_source_database(source_config, out)
+        except Exception as e:
+            logger.error(f"[ERROR] Error processing source {source_config['source_name']}: {e}")
+        return out
+    
+    def append_source_output(self, out):
+        """Append a finished source buffer to the output file and close it"""
+        with out:
+            out.seek(0)
+            while True:
+                chunk = out.read(1 << 20)
+                if not chunk:
+                    break
+                self._write_output(chunk)
+                self._line_count += chunk.count("\n")
+    
+    def _write_output(self, text: str):
+        """Write text to the output file, counting the encoded bytes written"""
+        self._bytes_written += self._out.write(text.encode('utf-8'))
+    
+    def open_output_file(self):
+        """Open the output file and write the file header"""
+        self._raw_out = open(self.output_file, 'wb', buffering=1 << 20)
+        if self.compress_output:
+            self._out = gzip.GzipFile(fileobj=self._raw_out, mode='wb', compresslevel=6)
+        else:
+            self._out = self._raw_out
+        self._bytes_written = 0
+        self._write_output("// ========================================\n")
+        self._write_output("// COMPLETE GRAPH DATABASE IMPORT\n")
+        self._write_output(f"// Generated: {datetime.now().isoformat()}\n")
+        self._write_output("// ========================================\n\n")
+    
+    def close_output_file(self):
+        """Close the streamed output file and register it in the control database"""
+        try:
+            # Closing the gzip stream writes its trailer but leaves the file open
+            if self._out is not self._raw_out:
+                self._out.close()
             
-            # Get file size
-            file_size_kb = os.path.getsize(self.output_file) // 1024
+            # File size on disk is the final offset; no stat() needed
+            file_size_kb = self._raw_out.tell() // 1024
+            self._raw_out.close()
             
             # Register the Cypher script in database
             self.register_cypher_script(self.output_file, file_size_kb)
             
             logger.info(f"\n[OK] Complete Cypher file generated: {self.output_file}")
             logger.info(f"[OK] File size: {file_size_kb} KB")
-            logger.info(f"[OK] Total lines: {len(self.cypher_output)}")
+            if self.compress_output:
+                logger.info(f"[OK] Uncompressed size: {self._bytes_written // 1024} KB")
+            logger.info(f"[OK] Total lines: {self._line_count}")
         except Exception as e:
             logger.error(f"[ERROR] Failed to write output file: {e}")
     
@@ -616,7 +1091,7 @@ class PostgresToNeo4jETL:
             script_name = os.path.basename(file_path)
             abs_path = os.path.abspath(file_path)
             
-            with self.control_conn.cursor() as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor() as cur:
                 # Insert or update the script record
                 cur.execute("""
                     INSERT INTO cypher_scripts 
@@ -630,11 +1105,10 @@ class PostgresToNeo4jETL:
                     RETURNING script_id
                 """, (script_name, abs_path, file_size_kb))
                 script_id = cur.fetchone()[0]
-                self.control_conn.commit()
+                conn.commit()
                 logger.info(f"[OK] Registered Cypher script in database (ID: {script_id})")
         except Exception as e:
             logger.error(f"[ERROR] Failed to register Cypher script: {e}")
-            self.control_conn.rollback()
     
     def run(self):
         """Main ETL execution method"""
@@ -661,15 +1135,18 @@ class PostgresToNeo4jETL:
                 self.complete_etl_run('completed')
                 return
             
-            # Process each source database
-            for source in sources:
-                try:
-                    self.process_source_database(source)
-                except Exception as e:
-                    logger.error(f"[ERROR] Error processing source {source['source_name']}: {e}")
+            self.open_output_file()
+            
+            # Process source databases concurrently; each writes its own buffer,
+            # which is appended to the output file in source_id order
+            max_workers = min(self.max_source_workers, len(sources))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._process_and_capture, source) for source in sources]
+                for future in futures:
+                    self.append_source_output(future.result())
             
-            # Write final combined output file
-            self.write_output_file()
+            # Finish the combined output file
+            self.close_output_file()
             
             # Mark ETL as completed
             self.complete_etl_run('completed')
@@ -684,25 +1161,42 @@ class PostgresToNeo4jETL:
             self.complete_etl_run('failed')
         
         finally:
-            if self.control_conn:
-                self.control_conn.close()
+            if self._out and not self._out.closed:
+                self._out.close()
+            if self._raw_out and not self._raw_out.closed:
+                self._raw_out.close()
+            if self.control_pool:
+                self.control_pool.closeall()
                 logger.info("\n[OK] Disconnected from control database")
 
 class Neo4jLoader:
     """Loads Cypher scripts into Neo4j Aura"""
     
-    def __init__(self, control_db_config, neo4j_uri, neo4j_user, neo4j_password):
+    def __init__(self, control_db_config, neo4j_uri, neo4j_user, neo4j_password,
+                 batch_size: int = 1000, unwind_batch_size: int = 10000,
+                 max_workers: int = 4, driver_config: Optional[Dict[str, Any]] = None,
+                 use_apoc: bool = True):
         self.control_db_config = control_db_config
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
-        self.control_conn = None
+        self.batch_size = batch_size  # statements (or APOC rows) committed per transaction
+        self.unwind_batch_size = unwind_batch_size  # rows per parameterized UNWIND
+        self.max_workers = max_workers  # concurrent sessions for node batches
+        self.driver_config = {
+            'max_connection_pool_size': max_workers,
+            **(driver_config or {}),
+        }
+        self.use_apoc = use_apoc  # set by aconnect_to_neo4j to whether APOC is available
+        self.control_pool = None
         self.neo4j_driver = None
     
     def connect_to_control_db(self):
-        """Connect to ETL control database"""
+        """Create the connection pool for the ETL control database"""
         try:
-            self.control_conn = psycopg2.connect(
+            self.control_pool = ThreadedConnectionPool(
+                minconn=1,
+                maxconn=4,
                 host=self.control_db_config.host,
                 port=self.control_db_config.port,
                 dbname=self.control_db_config.dbname,
@@ -715,16 +1209,24 @@ class Neo4jLoader:
             logger.error(f"[ERROR] Failed to connect to control database: {e}")
             return False
     
-    def connect_to_neo4j(self):
-        """Connect to Neo4j Aura"""
+    async def aconnect_to_neo4j(self):
+        """Connect to Neo4j Aura with the async driver"""
         try:
-            self.neo4j_driver = GraphDatabase.driver(
+            self.neo4j_driver = AsyncGraphDatabase.driver(
                 self.neo4j_uri,
-                auth=(self.neo4j_user, self.neo4j_password)
+                auth=(self.neo4j_user, self.neo4j_password),
+                **self.driver_config
             )
             # Test connection
-            self.neo4j_driver.verify_connectivity()
+            await self.neo4j_driver.verify_connectivity()
             logger.info(f"[OK] Connected to Neo4j Aura: {self.neo4j_uri}")
+            
+            if self.use_apoc:
+                self.use_apoc = await self._apoc_available()
+                if self.use_apoc:
+                    logger.info("[OK] Node batches will use apoc.periodic.iterate")
+                else:
+                    logger.info("[OK] APOC not available, batching node writes client-side")
             return True
         except Exception as e:
             logger.error(f"[ERROR] Failed to connect to Neo4j: {e}")
@@ -733,7 +1235,7 @@ class Neo4jLoader:
     def get_latest_cypher_script(self):
         """Get the latest Cypher script from cypher_scripts table"""
         try:
-            with self.control_conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with _pooled_connection(self.control_pool) as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT script_id, script_name, file_path, file_size_kb, last_updated_at
                     FROM cypher_scripts
@@ -747,7 +1249,7 @@ class Neo4jLoader:
                     logger.info(f"     Path: {script['file_path']}")
                     logger.info(f"     Size: {script['file_size_kb']} KB")
                     logger.info(f"     Updated: {script['last_updated_at']}")
-                    return dict(script)
+                    return script
                 else:
                     logger.warning("[WARN] No Cypher scripts found in database")
                     return None
@@ -755,86 +1257,374 @@ class Neo4jLoader:
             logger.error(f"[ERROR] Failed to get latest script: {e}")
             return None
     
-    def read_cypher_file(self, file_path):
-        """Read Cypher file and split into individual statements"""
+    @contextmanager
+    def _open_cypher_segments(self, file_path):
+        """
+        Open a Cypher script as an iterable of byte segments. Plain scripts are
+        memory-mapped as a single segment, so the file is never copied into
+        Python memory; gzip output from the ETL is streamed in 1 MiB chunks.
+        """
+        if file_path.endswith('.gz'):
+            with gzip.open(file_path, 'rb') as f:
+                yield iter(lambda: f.read(1 << 20), b'')
+            return
+        
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files can't be mapped
+                yield ()
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield (mm,)
+    
+    def _scan_cypher_file(self, file_path):
+        """Yield statements from each segment of a script, carrying partial ones over"""
+        with self._open_cypher_segments(file_path) as segments:
+            tail = b''
+            for segment in segments:
+                tail = yield from _scan_statements(tail + segment if tail else segment, False)
+            if tail:
+                yield from _scan_statements(tail, True)
+    
+    def iter_cypher_statements(self, file_path):
+        """
+        Stream Cypher statements from a file one at a time, so only the current
+        statement is held in memory. Statements end at ';' outside string
+        literals; // and /* */ comments are dropped. The scan itself is one
+        compiled regex (_CYPHER_TOKEN_RE), so the per-character work stays in C.
+        """
+        count = 0
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Split by semicolons (end of statements)
-            statements = []
-            for line in content.split('\n'):
-                line = line.strip()
-                # Skip comments and empty lines
-                if line and not line.startswith('//'):
-                    statements.append(line)
-            
-            # Join lines that are part of the same statement
-            combined_statements = []
-            current_statement = []
-            
-            for line in statements:
-                current_statement.append(line)
-                if line.endswith(';'):
-                    combined_statements.append(' '.join(current_statement))
-                    current_statement = []
-            
-            logger.info(f"[OK] Read {len(combined_statements)} Cypher statements from file")
-            return combined_statements
+            for count, statement in enumerate(self._scan_cypher_file(file_path), 1):
+                yield statement
+            logger.info(f"[OK] Read {count} Cypher statements from file")
         except Exception as e:
             logger.error(f"[ERROR] Failed to read Cypher file: {e}")
-            return []
+            raise
+    
+    async def _apoc_available(self) -> bool:
+        """Check whether the server has apoc.periodic.iterate installed"""
+        try:
+            async with self.neo4j_driver.session() as session:
+                result = await session.run(
+                    "SHOW PROCEDURES YIELD name WHERE name = 'apoc.periodic.iterate' "
+                    "RETURN count(*) AS found"
+                )
+                record = await result.single()
+                return bool(record and record['found'])
+        except Exception as e:
+            logger.warning(f"[WARN] Could not check for APOC: {str(e)[:100]}")
+            return False
     
-    def clear_neo4j_database(self):
-        """Clear all nodes and relationships in Neo4j (optional)"""
+    async def clear_neo4j_database(self):
+        """
+        Clear all nodes and relationships in Neo4j (optional).
+        Deletes are committed every 50000 rows so large graphs don't build
+        one huge transaction; CALL ... IN TRANSACTIONS needs an auto-commit query.
+        """
         try:
-            with self.neo4j_driver.session() as session:
+            async with self.neo4j_driver.session() as session:
                 # Delete all relationships first
-                session.run("MATCH ()-[r]->() DELETE r")
+                await (await session.run(
+                    "MATCH ()-[r]->() CALL { WITH r DELETE r } IN TRANSACTIONS OF 50000 ROWS"
+                )).consume()
                 # Delete all nodes
-                session.run("MATCH (n) DELETE n")
+                await (await session.run(
+                    "MATCH (n) CALL { WITH n DELETE n } IN TRANSACTIONS OF 50000 ROWS"
+                )).consume()
                 logger.info("[OK] Cleared Neo4j database")
         except Exception as e:
             logger.error(f"[ERROR] Failed to clear database: {e}")
     
-    def execute_cypher_statements(self, statements):
-        """Execute Cypher statements in Neo4j"""
+    @staticmethod
+    async def _apply_statements(tx, statements):
+        """Transaction function: run each statement, surfacing errors before commit"""
+        for statement in statements:
+            await (await tx.run(statement)).consume()
+    
+    @staticmethod
+    async def _apply_unwind(tx, query, rows):
+        """Transaction function: run a parameterized UNWIND over rows"""
+        await (await tx.run(query, rows=rows)).consume()
+    
+    def _plan_statements(self, statements):
+        """
+        Yield (index, query, rows, sizes) in file order. Consecutive node batches
+        with the same template are merged into one UNWIND $rows of up to
+        unwind_batch_size rows and UNWIND_MAX_PAYLOAD_CHARS of source text;
+        sizes holds the row count of each merged statement. A single statement
+        over the payload limit is still sent whole (lower the ETL's
+        node_batch_size for very wide rows). Other statements are yielded as-is
+        with rows and sizes set to None.
+        """
+        template = None
+        for i, statement in enumerate(statements, 1):
+            canonical = _canonicalize(statement)
+            if (canonical and canonical[0] == template
+                    and len(rows) + len(canonical[1]) <= self.unwind_batch_size
+                    and payload + len(statement) <= UNWIND_MAX_PAYLOAD_CHARS):
+                rows.extend(canonical[1])
+                sizes.append(len(canonical[1]))
+                payload += len(statement)
+                continue
+            
+            if template is not None:
+                yield first, template, rows, sizes
+                template = None
+            if canonical:
+                template, rows = canonical
+                sizes = [len(rows)]
+                payload = len(statement)
+                first = i
+            else:
+                yield i, statement, None, None
+        
+        if template is not None:
+            yield first, template, rows, sizes
+    
+    async def _execute_apoc_iterate(self, session, first, query, rows, sizes):
+        """
+        Hand a merged node batch to apoc.periodic.iterate, which commits every
+        batch_size rows server-side. Its inner transactions commit independently,
+        so a failure can't be retried without duplicating nodes; any failed rows
+        count the whole merged batch as failed.
+        """
+        last = first + len(sizes) - 1
+        try:
+            result = await session.run(
+                _APOC_ITERATE_QUERY,
+                action=query[len(_UNWIND_ROWS_PREFIX):],
+                rows=rows,
+                batch_size=self.batch_size
+            )
+            summary = await result.single()
+        except Exception as e:
+            logger.error(f"[ERROR] Statements {first}-{last} failed: {str(e)[:100]}")
+            logger.error(f"         Statement: {query[:100]}...")
+            return 0, len(sizes)
+        
+        if summary['failedOperations']:
+            logger.error(
+                f"[ERROR] {summary['failedOperations']} of {summary['total']} rows failed "
+                f"in statements {first}-{last}: {str(summary['errorMessages'])[:100]}"
+            )
+            logger.error(f"         Statement: {query[:100]}...")
+            return 0, len(sizes)
+        return len(sizes), 0
+    
+    @staticmethod
+    def _is_statement_error(error):
+        """
+        True if the server rejected the statements themselves (bad data or
+        Cypher), so splitting the batch can isolate them. Connection and
+        transient errors were already retried by execute_write, and retrying
+        each half would only repeat that wait.
+        """
+        return isinstance(error, Neo4jError) and not error.is_retryable()
+    
+    async def _execute_unwind(self, session, first, query, rows, sizes):
+        """
+        Execute a merged UNWIND $rows in one write transaction. If the server
+        rejects it, bisect: retry each half (split on original statement
+        boundaries) in its own transaction until the failing statements are
+        isolated. Any other error fails the whole batch.
+        """
+        try:
+            await session.execute_write(self._apply_unwind, query, rows)
+            return len(sizes), 0
+        except Exception as e:
+            if len(sizes) == 1 or not self._is_statement_error(e):
+                last = first + len(sizes) - 1
+                label = f"Statement {first}" if first == last else f"Statements {first}-{last}"
+                logger.error(f"[ERROR] {label} failed: {str(e)[:100]}")
+                logger.error(f"         Statement: {query[:100]}...")
+                return 0, len(sizes)
+            logger.warning(f"[WARN] Batch of {len(sizes)} statements failed, bisecting: {str(e)[:100]}")
+        
+        middle = len(sizes) // 2
+        split = sum(sizes[:middle])
+        left = await self._execute_unwind(session, first, query, rows[:split], sizes[:middle])
+        right = await self._execute_unwind(session, first + middle, query, rows[split:], sizes[middle:])
+        return left[0] + right[0], left[1] + right[1]
+    
+    async def _execute_batch(self, session, batch):
+        """
+        Execute (index, statement) pairs in one write transaction. If the server
+        rejects it, bisect: retry each half in its own transaction until the
+        failing statements are isolated, so the rest of the batch still commits.
+        Any other error fails the whole batch.
+        """
+        if not batch:
+            return 0, 0
+        
+        try:
+            await session.execute_write(self._apply_statements, [statement for _, statement in batch])
+            return len(batch), 0
+        except Exception as e:
+            if len(batch) == 1 or not self._is_statement_error(e):
+                (first, statement), last = batch[0], batch[-1][0]
+                label = f"Statement {first}" if first == last else f"Statements {first}-{last}"
+                logger.error(f"[ERROR] {label} failed: {str(e)[:100]}")
+                logger.error(f"         Statement: {statement[:100]}...")
+                return 0, len(batch)
+            logger.warning(f"[WARN] Batch of {len(batch)} statements failed, bisecting: {str(e)[:100]}")
+        
+        middle = len(batch) // 2
+        left = await self._execute_batch(session, batch[:middle])
+        right = await self._execute_batch(session, batch[middle:])
+        return left[0] + right[0], left[1] + right[1]
+    
+    async def _execute_schema_statement(self, session, i, statement):
+        """Run a schema statement on its own in auto-commit mode"""
+        try:
+            await (await session.run(statement)).consume()
+            return 1, 0
+        except Exception as e:
+            logger.error(f"[ERROR] Statement {i} failed: {str(e)[:100]}")
+            logger.error(f"         Statement: {statement[:100]}...")
+            return 0, 1
+    
+    @asynccontextmanager
+    async def _session_pool(self):
+        """
+        Open max_workers long-lived write sessions and hand them out through a
+        queue. Batches reuse them instead of opening a session each, and taking
+        one from the queue is what caps concurrency at max_workers.
+        """
+        async with AsyncExitStack() as stack:
+            sessions = asyncio.Queue()
+            for _ in range(self.max_workers):
+                sessions.put_nowait(await stack.enter_async_context(self.neo4j_driver.session()))
+            yield sessions
+    
+    async def _in_session(self, sessions, job, *args):
+        """Run job(session, *args) on a pooled session, once one is free"""
+        session = await sessions.get()
+        try:
+            return await job(session, *args)
+        finally:
+            sessions.put_nowait(session)
+    
+    async def execute_cypher_statements(self, statements):
+        """
+        Execute Cypher statements in Neo4j, committing batch_size statements per
+        transaction. Node batches are sent as parameterized UNWIND $rows, one
+        transaction each (or one apoc.periodic.iterate call each when APOC is
+        available), with up to max_workers in flight at once. Every other
+        statement waits for in-flight node batches first, so file order is kept
+        wherever it matters. Schema statements run on their own in auto-commit mode.
+        All of it runs on a fixed set of max_workers sessions opened up front.
+        """
         success_count = 0
         error_count = 0
+        batch = []
+        pending = set()
         
-        with self.neo4j_driver.session() as session:
-            for i, statement in enumerate(statements, 1):
-                try:
-                    session.run(statement)
-                    success_count += 1
+        def record(results):
+            nonlocal success_count, error_count
+            for succeeded, failed in results:
+                success_count += succeeded
+                error_count += failed
+        
+        async def report_progress():
+            # Progress is logged on a timer instead of from the execution path
+            reported = 0
+            while True:
+                await asyncio.sleep(PROGRESS_LOG_SECONDS)
+                executed = success_count + error_count
+                if executed != reported:
+                    logger.info(f"[PROGRESS] Executed {executed} statements")
+                    reported = executed
+        
+        async def drain():
+            nonlocal pending
+            if pending:
+                record(await asyncio.gather(*pending))
+                pending = set()
+        
+        async def flush():
+            nonlocal batch
+            await drain()
+            record([await self._in_session(sessions, self._execute_batch, batch)])
+            batch = []
+        
+        async with self._session_pool() as sessions:
+            reporter = asyncio.create_task(report_progress())
+            try:
+                for i, statement, rows, sizes in self._plan_statements(statements):
+                    if rows is not None and _UNWIND_CREATE_RE.match(statement):
+                        if batch:
+                            await flush()
+                        execute = self._execute_apoc_iterate if self.use_apoc else self._execute_unwind
+                        pending.add(asyncio.create_task(
+                            self._in_session(sessions, execute, i, statement, rows, sizes)
+                        ))
+                        # Bound the rows held in memory by queued batches
+                        if len(pending) >= 2 * self.max_workers:
+                            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                            record(task.result() for task in done)
+                        continue
                     
-                    # Log progress every 100 statements
-                    if i % 100 == 0:
-                        logger.info(f"[PROGRESS] Executed {i}/{len(statements)} statements")
+                    if rows is None and not _SCHEMA_STATEMENT_RE.match(statement):
+                        await drain()
+                        batch.append((i, statement))
+                        if len(batch) >= self.batch_size:
+                            await flush()
+                        continue
+                    
+                    if batch:
+                        await flush()
+                    await drain()
+                    if rows is not None:
+                        record([await self._in_session(sessions, self._execute_unwind, i, statement, rows, sizes)])
+                    else:
+                        record([await self._in_session(sessions, self._execute_schema_statement, i, statement)])
                 
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"[ERROR] Statement {i} failed: {str(e)[:100]}")
-                    logger.error(f"         Statement: {statement[:100]}...")
+                await drain()
+                if batch:
+                    await flush()
+            finally:
+                reporter.cancel()
+                # Don't leave node batches running if reading the script failed
+                for task in pending:
+                    task.cancel()
+                # Let cancelled batches give their sessions back before they close
+                await asyncio.gather(*pending, return_exceptions=True)
         
         return success_count, error_count
     
     def update_script_run_time(self, script_id):
-        """Update last_run_time in cypher_scripts table"""
+        """
+        Update last_run_time in cypher_scripts table.
+        A single UPDATE needs no explicit transaction, so it runs in auto-commit
+        mode (no BEGIN/COMMIT round-trips) and RETURNING reports the new value.
+        """
         try:
-            with self.control_conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE cypher_scripts
-                    SET last_run_time = NOW()
-                    WHERE script_id = %s
-                """, (script_id,))
-                self.control_conn.commit()
-                logger.info(f"[OK] Updated script run time")
+            with _pooled_connection(self.control_pool) as conn, conn.cursor() as cur:
+                conn.autocommit = True
+                try:
+                    cur.execute("""
+                        UPDATE cypher_scripts
+                        SET last_run_time = NOW()
+                        WHERE script_id = %s
+                        RETURNING last_run_time
+                    """, (script_id,))
+                    updated = cur.fetchone()
+                finally:
+                    conn.autocommit = False
+            
+            if updated:
+                logger.info(f"[OK] Updated script run time: {updated[0]}")
+            else:
+                logger.warning(f"[WARN] Script {script_id} no longer exists; run time not updated")
         except Exception as e:
             logger.error(f"[ERROR] Failed to update run time: {e}")
-            self.control_conn.rollback()
     
     def load(self, clear_database=False):
+        """Main load process; runs aload on a fresh event loop"""
+        return asyncio.run(self.aload(clear_database=clear_database))
+    
+    async def aload(self, clear_database=False):
         """Main load process"""
         logger.info("\n" + "="*60)
         logger.info("Starting Neo4j Loader")
@@ -844,7 +1634,7 @@ class Neo4jLoader:
         if not self.connect_to_control_db():
             return False
         
-        if not self.connect_to_neo4j():
+        if not await self.aconnect_to_neo4j():
             return False
         
         try:
@@ -862,20 +1652,17 @@ class Neo4jLoader:
             # Optionally clear database
             if clear_database:
                 logger.info("\n[WARN] Clearing Neo4j database...")
-                self.clear_neo4j_database()
+                await self.clear_neo4j_database()
             
-            # Read Cypher file
-            logger.info(f"\n[LOADING] Reading Cypher file...")
-            statements = self.read_cypher_file(script['file_path'])
+            # Stream statements from the Cypher file straight into Neo4j
+            logger.info(f"\n[LOADING] Executing statements from Cypher file in Neo4j...")
+            statements = self.iter_cypher_statements(script['file_path'])
+            success_count, error_count = await self.execute_cypher_statements(statements)
             
-            if not statements:
+            if success_count + error_count == 0:
                 logger.error("[ERROR] No statements to execute")
                 return False
             
-            # Execute statements
-            logger.info(f"\n[LOADING] Executing {len(statements)} statements in Neo4j...")
-            success_count, error_count = self.execute_cypher_statements(statements)
-            
             # Update run time
             self.update_script_run_time(script['script_id'])
             
@@ -885,7 +1672,7 @@ class Neo4jLoader:
             logger.info("="*60)
             logger.info(f"Successful: {success_count}")
             logger.info(f"Failed: {error_count}")
-            logger.info(f"Total: {len(statements)}")
+            logger.info(f"Total: {success_count + error_count}")
             
             if error_count > 0:
                 logger.warning(f"\n[WARN] {error_count} statements failed. Check neo4j_loader.log for details.")
@@ -897,10 +1684,10 @@ class Neo4jLoader:
             return False
         
         finally:
-            if self.control_conn:
-                self.control_conn.close()
+            if self.control_pool:
+                self.control_pool.closeall()
             if self.neo4j_driver:
-                self.neo4j_driver.close()
+                await self.neo4j_driver.close()
 
 def main():
     """Entry point for the ETL script"""
@@ -914,7 +1701,8 @@ def main():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         etl = PostgresToNeo4jETL(
             control_db_config=control_db_config,
-            output_file=f"./graph_output_{timestamp}.cypher" 
+            output_file=f"./graph_output_{timestamp}.cypher",
+            compress_output=os.getenv('ETL_COMPRESS_OUTPUT', 'false').lower() == 'true'
         )
         
         etl.run()
@@ -935,7 +1723,7 @@ def main():
         # Set to True if you want to start fresh, False to append
         clear_database = True  # Change this as needed
         
-        loader.load(clear_database=clear_database)
+        asyncio.run(loader.aload(clear_database=clear_database))
 
         
     except ValueError as e: